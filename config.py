@@ -1,21 +1,76 @@
 import os
 from dataclasses import dataclass, field
-from typing import List
+from functools import lru_cache
+from typing import FrozenSet, List, Optional
+
+# Preprocessing stages that can be saved in debug mode; 'mosaic' combines all of them
+DEBUG_STAGES = ['original', 'gray', 'thresh', 'dilate', 'contours', 'mosaic']
+
+# Standard tessdata folders of system Tesseract installs (Debian/Ubuntu, Fedora, Homebrew, Windows)
+_TESSDATA_LOCATIONS = [
+    '/usr/share/tesseract-ocr/5/tessdata',
+    '/usr/share/tesseract-ocr/4.00/tessdata',
+    '/usr/share/tessdata',
+    '/usr/local/share/tessdata',
+    '/opt/homebrew/share/tessdata',
+    r'C:\Program Files\Tesseract-OCR\tessdata',
+]
+
+def _tessdata_dir(path: Optional[str] = None) -> Optional[str]:
+    """
+    Resolve the folder holding the tesseract language data.
+    
+    tesserocr wheels bundle their own libtesseract, which does not know where
+    the system Tesseract keeps its language data, so the folder is looked up
+    here and passed to tesseract explicitly.
+    
+    Args:
+        path: Folder given by the user; TESSDATA_PREFIX and the standard
+            install locations are tried when it is not set
+        
+    Returns:
+        The tessdata folder ending in a path separator, or None if none was found
+    """
+    prefix = path or os.environ.get('TESSDATA_PREFIX')
+    candidates = [prefix] if prefix else _TESSDATA_LOCATIONS
+    for candidate in candidates:
+        # Tesseract 3 expects the parent of tessdata, later versions the folder itself
+        nested = os.path.join(candidate, 'tessdata')
+        folder = nested if os.path.isdir(nested) else candidate
+        if os.path.isdir(folder):
+            return os.path.join(folder, '')
+    return None
+
+@lru_cache(maxsize=None)
+def _get_installed_langs(tessdata_dir: Optional[str] = None) -> FrozenSet[str]:
+    """Return the tesseract languages installed in a tessdata folder, looked up once per folder."""
+    import tesserocr
+    if tessdata_dir:
+        _, languages = tesserocr.get_languages(tessdata_dir)
+    else:
+        _, languages = tesserocr.get_languages()
+    return frozenset(languages)
 
 @dataclass
 class Config:
     # OCR settings
     languages: List[str] = field(default_factory=lambda: ['eng'])
-    tesseract_config: str = '--psm 7'
+    psm: int = 7  # tesseract page segmentation mode (7: single text line)
+    per_language: bool = False  # run a separate OCR pass for each language
+    ocr_workers: int = field(default_factory=lambda: os.cpu_count() or 1)  # parallel OCR workers
+    dedup_threshold: int = 0  # reuse text of frames whose text fingerprint differs in fewer cells (0 disables)
+    tessdata_dir: Optional[str] = None  # tesseract language data folder (default: TESSDATA_PREFIX or a standard location)
     
     # Frame extraction settings
     frame_gap: float = 5.0  # seconds between frames
+    frame_queue_size: int = 8  # frames decoded ahead of OCR
     save_frames: bool = False  # whether to save frame screenshots
     save_frame_text: bool = False  # whether to save text for each frame
     
     # Debug settings
     debug: bool = False  # whether to save debug images
     debug_folder: str = 'debug'  # folder for debug images
+    debug_stages: List[str] = field(default_factory=lambda: ['gray'])  # preprocessing stages to save
     
     # Logging
     log_file: str = 'video_processing.log'
@@ -25,28 +80,35 @@ class Config:
     text_folder: str = 'text'
     
     def __post_init__(self):
-        # Create all necessary directories
-        for folder in [self.frames_folder, self.text_folder]:
-            os.makedirs(folder, exist_ok=True)
-        
-        # Create debug folder if debug mode is enabled
+        # Resolve the language data folder once, then validate languages against it
+        self.tessdata_dir = _tessdata_dir(self.tessdata_dir)
+        self._validate_languages()
+    
+    def create_folders(self):
+        """Create the output folders needed by the enabled settings."""
+        if self.save_frames:
+            os.makedirs(self.frames_folder, exist_ok=True)
+        if self.save_frame_text:
+            os.makedirs(self.text_folder, exist_ok=True)
         if self.debug:
             os.makedirs(self.debug_folder, exist_ok=True)
-        
-        # Validate languages
-        self._validate_languages()
     
     def _validate_languages(self):
         """Validate that all specified languages are installed."""
-        import pytesseract
         try:
-            # Get list of installed languages
-            installed_langs = pytesseract.get_languages()
-            
             # Check each language
             for lang in self.languages:
                 # Split combined language string and check each
                 lang_parts = lang.split('+')
+                
+                # Checking the language files directly avoids loading tesseract
+                if self.tessdata_dir and all(
+                    os.path.isfile(os.path.join(self.tessdata_dir, f'{part}.traineddata')) for part in lang_parts
+                ):
+                    continue
+                
+                # Fall back to the set of installed languages reported by tesseract
+                installed_langs = _get_installed_langs(self.tessdata_dir)
                 missing_langs = [part for part in lang_parts if part not in installed_langs]
                 if missing_langs:
                     raise ValueError(
@@ -1,18 +1,70 @@
 import os
 import logging
-import shutil
+import logging.handlers
 import sys
 from typing import List
 import utils
-from config import Config
+from config import Config, DEBUG_STAGES
 import argparse
+import itertools
 
-def setup_logging(config: Config):
+class BufferedFileHandler(logging.handlers.BufferingHandler):
+    """
+    Append log records to a file in blocks.
+    
+    logging.FileHandler writes and flushes the file once per record. This
+    handler keeps records in memory and writes them with a single flush once
+    the buffer is full, a record at flush_level or above arrives, or the
+    handler is flushed or closed.
+    """
+    
+    def __init__(self, filename: str, capacity: int = 1024, flush_level: int = logging.ERROR):
+        super().__init__(capacity)
+        self.flush_level = flush_level
+        self.stream = open(filename, 'a', encoding='utf-8')
+    
+    def shouldFlush(self, record: logging.LogRecord) -> bool:
+        return super().shouldFlush(record) or record.levelno >= self.flush_level
+    
+    def flush(self):
+        self.acquire()
+        try:
+            if not self.buffer or self.stream.closed:
+                return
+            
+            # Like Handler.emit, report records that fail to format instead of raising
+            lines = []
+            for record in self.buffer:
+                try:
+                    lines.append(self.format(record) + '\n')
+                except Exception:
+                    self.handleError(record)
+            
+            try:
+                self.stream.write(''.join(lines))
+                self.stream.flush()
+            except Exception:
+                self.handleError(self.buffer[-1])
+        finally:
+            # Drop the records even on failure so one bad record can't wedge the handler
+            self.buffer.clear()
+            self.release()
+    
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.stream.close()
+
+def setup_logging(config: Config) -> logging.Handler:
     """
     Set up logging configuration.
     
     Args:
         config: Configuration object containing logging settings
+        
+    Returns:
+        The buffered file handler, to be flushed before exiting
     """
     # Set log level based on debug mode
     log_level = logging.DEBUG if config.debug else logging.INFO
@@ -22,7 +74,7 @@ def setup_logging(config: Config):
     user_formatter = logging.Formatter('%(message)s')
     
     # Create handlers
-    file_handler = logging.FileHandler(config.log_file)
+    file_handler = BufferedFileHandler(config.log_file)
     file_handler.setFormatter(debug_formatter)
     file_handler.setLevel(logging.DEBUG)  # Always log everything to file
     
@@ -35,21 +87,29 @@ def setup_logging(config: Config):
     root_logger.setLevel(logging.DEBUG)
     root_logger.addHandler(file_handler)
     root_logger.addHandler(console_handler)
+    
+    return file_handler
 
-def cleanup_folders(config: Config):
+def positive_int(value: str) -> int:
     """
-    Clean up temporary folders if they're not needed.
+    Parse a command line value that must be a positive integer.
     
     Args:
-        config: Configuration object
+        value: Command line value
+        
+    Returns:
+        Parsed integer
+        
+    Raises:
+        argparse.ArgumentTypeError: If the value is not an integer of at least 1
     """
     try:
-        if not config.save_frames and os.path.exists(config.frames_folder):
-            shutil.rmtree(config.frames_folder)
-        if not config.save_frame_text and os.path.exists(config.text_folder):
-            shutil.rmtree(config.text_folder)
-    except Exception as e:
-        logging.warning(f"Failed to clean up folders: {str(e)}")
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {number}")
+    return number
 
 def dedup_words(texts: List[str]) -> List[str]:
     """
@@ -61,12 +121,8 @@ def dedup_words(texts: List[str]) -> List[str]:
     Returns:
         List of unique words
     """
-    wordSet = set()
-    for text in texts:
-        if text.strip():  # Only process non-empty strings
-            words = text.split()
-            wordSet.update(words)
-    return sorted(list(wordSet))
+    # dict.fromkeys consumes the word stream and dedups it entirely in C
+    return sorted(dict.fromkeys(itertools.chain.from_iterable(text.split() for text in texts if text)))
 
 def process_video(video_path: str, config: Config) -> None:
     """
@@ -83,12 +139,10 @@ def process_video(video_path: str, config: Config) -> None:
     try:
         logger.info(f"Processing video: {video_path}")
         
-        # get frames from video
+        # stream frames from video
         frames = utils.get_frames(video_path, config)
-        if not frames:
-            raise ValueError("No frames were extracted from the video")
         
-        # extract text from frames
+        # extract text from frames as they are decoded
         text = utils.extract_text(frames, config)
         if not text:
             logger.warning("No text was extracted from any frames")
@@ -113,6 +167,8 @@ def main():
     """
     Main entry point for the video processing application.
     """
+    file_handler = None
+    logger = logging.getLogger(__name__)
     try:
         # Add command line argument parsing
         parser = argparse.ArgumentParser(description='Video text extraction and processing')
@@ -137,9 +193,31 @@ def main():
                           nargs='+',
                           default=['eng'],
                           help='Languages to use for OCR (default: eng). Can be combined with +. Example: eng+chi_tra')
+        parser.add_argument('--per-language',
+                          action='store_true',
+                          help='Run a separate OCR pass for each language instead of one combined pass; '
+                               'loads one tesseract engine per language in every worker (default: False)')
+        parser.add_argument('--workers',
+                          type=positive_int,
+                          default=os.cpu_count() or 1,
+                          help='Number of frames to OCR in parallel; each worker loads its own tesseract engine (default: number of CPUs)')
+        parser.add_argument('--dedup-threshold',
+                          type=int,
+                          default=0,
+                          help='Reuse the previous frame\'s text when their text fingerprints differ in fewer cells; 0 disables (default: 0)')
+        parser.add_argument('--tessdata-dir',
+                          type=str,
+                          default=None,
+                          help='Folder containing the Tesseract language data (default: TESSDATA_PREFIX or a standard install location)')
         parser.add_argument('--debug',
                           action='store_true',
                           help='Show detailed debug information (default: False)')
+        parser.add_argument('--debug-stages',
+                          type=str,
+                          nargs='+',
+                          choices=DEBUG_STAGES,
+                          default=['gray'],
+                          help='Preprocessing stages to save as debug images; gray is the OCR input, mosaic saves all stages in one image (default: gray)')
         
         args = parser.parse_args()
         
@@ -152,12 +230,16 @@ def main():
             save_frames=args.save_frames,
             save_frame_text=args.save_frame_text,
             languages=args.languages,
-            debug=args.debug
+            per_language=args.per_language,
+            ocr_workers=args.workers,
+            dedup_threshold=args.dedup_threshold,
+            tessdata_dir=args.tessdata_dir,
+            debug=args.debug,
+            debug_stages=args.debug_stages
         )
         
         # Set up logging with file handler after config is created
-        setup_logging(config)
-        logger = logging.getLogger(__name__)
+        file_handler = setup_logging(config)
         
         if config.debug:
             logger.info("Starting video processing application")
@@ -165,7 +247,12 @@ def main():
             logger.info(f"Save frames: {config.save_frames}")
             logger.info(f"Save frame text: {config.save_frame_text}")
             logger.info(f"Languages: {', '.join(config.languages)}")
+            logger.info(f"Per-language OCR: {config.per_language}")
+            logger.info(f"OCR workers: {config.ocr_workers}")
+            logger.info(f"Dedup threshold: {config.dedup_threshold}")
+            logger.info(f"Tessdata folder: {config.tessdata_dir}")
             logger.info(f"Debug mode: {config.debug}")
+            logger.info(f"Debug stages: {', '.join(config.debug_stages)}")
         else:
             logger.info("Starting video processing...")
         
@@ -182,9 +269,6 @@ def main():
         except Exception as e:
             logger.error(f"Error: {str(e)}")
             sys.exit(1)
-        finally:
-            # Clean up temporary folders
-            cleanup_folders(config)
             
         if config.debug:
             logger.info("Video processing completed")
@@ -192,6 +276,10 @@ def main():
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         sys.exit(1)
+    finally:
+        # Write out any buffered log records
+        if file_handler is not None:
+            file_handler.flush()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
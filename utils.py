@@ -1,25 +1,62 @@
 import os
 import logging
+import queue
+import subprocess
+import tempfile
+import threading
 import ffmpeg
-import pytesseract
 import cv2
 import numpy as np
-from PIL import Image
-from typing import List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from config import Config
 
+# Keep libtesseract single-threaded; the OCR pool provides the parallelism.
+# OpenMP reads this when the library is loaded, so set it before importing tesserocr.
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+from tesserocr import PyTessBaseAPI
+
 logger = logging.getLogger(__name__)
 
-def calculate_frame_info(video_path: str, frame_gap: float) -> Tuple[float, int, int]:
+# Marks the end of a prefetched sequence
+_END = object()
+
+@lru_cache(maxsize=None)
+def _default_config() -> Config:
+    """
+    Build the default configuration on first use.
+    
+    Returns:
+        Shared default configuration object
+    """
+    return Config()
+
+def _parse_frame_rate(rate: str) -> float:
+    """
+    Parse an ffprobe frame rate fraction such as 30000/1001.
+    
+    Args:
+        rate: Frame rate as reported by ffprobe
+        
+    Returns:
+        Frame rate in frames per second, or 0.0 if it is unknown
+    """
+    num, _, den = rate.partition('/')
+    den = float(den or 1)
+    return float(num) / den if den else 0.0
+
+def calculate_frame_info(video_path: str, frame_gap: float) -> Tuple[float, int, int, int, int, int]:
     """
-    Calculate video duration, number of frames, and required digits for frame filenames.
+    Calculate video duration, number of frames, required digits for frame filenames,
+    the source frame step matching the frame gap, and the decoded frame size.
     
     Args:
         video_path: Path to the video file
         frame_gap: Time gap between frames in seconds
         
     Returns:
-        Tuple containing (duration, num_frames, num_digits)
+        Tuple containing (duration, num_frames, num_digits, frame_step, width, height)
         
     Raises:
         FileNotFoundError: If video file doesn't exist
@@ -29,136 +66,427 @@ def calculate_frame_info(video_path: str, frame_gap: float) -> Tuple[float, int,
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video file not found: {video_path}")
             
-        # Get video duration
+        # Get video duration and frame rate
         probe = ffmpeg.probe(video_path)
-        duration = float(probe['streams'][0]['duration'])
+        video_stream = next(stream for stream in probe['streams'] if stream['codec_type'] == 'video')
+        duration = float(video_stream.get('duration', probe['format']['duration']))
+        fps = _parse_frame_rate(video_stream['avg_frame_rate']) or _parse_frame_rate(video_stream['r_frame_rate'])
+        
+        # ffmpeg applies rotation metadata when decoding, so portrait videos swap dimensions
+        width, height = int(video_stream['width']), int(video_stream['height'])
+        rotation = int(video_stream.get('tags', {}).get('rotate', 0))
+        for side_data in video_stream.get('side_data_list', []):
+            rotation = int(side_data.get('rotation', rotation))
+        if rotation % 180:
+            width, height = height, width
+        
+        # Calculate number of source frames between extracted frames
+        frame_step = max(1, int(round(fps * frame_gap)))
         
-        # Calculate number of frames
-        num_frames = int(duration / frame_gap)
+        # Calculate number of frames, including the first one at 0s
+        num_frames = int(duration / frame_gap) + 1
         
         # Calculate required number of digits for frame filenames
         num_digits = len(str(num_frames))
         
         logger.debug(f"Video duration: {duration:.2f}s")
-        logger.debug(f"Number of frames to extract: {num_frames}")
+        logger.debug(f"Video frame rate: {fps:.2f}fps")
+        logger.debug(f"Frame size: {width}x{height}")
+        logger.debug(f"Number of frames to extract: {num_frames} (every {frame_step} source frames)")
         logger.debug(f"Using {num_digits} digits for frame filenames")
         
-        return duration, num_frames, num_digits
+        return duration, num_frames, num_digits, frame_step, width, height
         
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         raise
 
-def get_frames(video_path: str, config: Config = Config()) -> List[str]:
+def get_frames(video_path: str, config: Optional[Config] = None) -> Iterator[Tuple[str, np.ndarray]]:
     """
     Extract frames from a video file.
     
+    Frames are streamed from ffmpeg through a pipe as raw BGR pixels, so they
+    skip the JPEG encode/decode round-trip. They are only written to disk
+    when config.save_frames is enabled.
+    
     Args:
         video_path: Path to the video file
         config: Configuration object containing settings
         
-    Returns:
-        List of paths to extracted frames
+    Yields:
+        Tuples containing (frame_name, frame image as BGR numpy array), in video order
         
     Raises:
         FileNotFoundError: If video file doesn't exist
         ffmpeg.Error: If frame extraction fails
+        ValueError: If no frames were extracted
     """
+    if config is None:
+        config = _default_config()
+    
     try:
         logger.debug(f"Extracting frames from video: {video_path}")
+        config.create_folders()
         
         # Calculate frame information
-        duration, num_frames, num_digits = calculate_frame_info(video_path, config.frame_gap)
+        duration, num_frames, num_digits, frame_step, width, height = calculate_frame_info(video_path, config.frame_gap)
+        frame_size = width * height * 3
+        
+        # Keep every frame_step-th source frame so the rest are dropped before conversion
+        args = (
+            ffmpeg.input(video_path)
+            .filter('select', f'not(mod(n,{frame_step}))')
+            .output('pipe:', format='rawvideo', pix_fmt='bgr24', vsync='vfr')
+            .global_args('-loglevel', 'error')
+            .compile()
+        )
         
-        # Create output pattern with calculated digits
-        output_pattern = os.path.join(config.frames_folder, f'%0{num_digits}d.jpg')
+        # Send stderr to a temporary file rather than a pipe: decoder errors on a
+        # damaged video could fill an unread pipe and stall ffmpeg's frame output
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=stderr_file)
+            try:
+                count = 0
+                while True:
+                    buffer = bytearray(frame_size)
+                    if process.stdout.readinto(buffer) < frame_size:
+                        break
+                    image = np.frombuffer(buffer, np.uint8).reshape(height, width, 3)
+                    frame_name = f'{count:0{num_digits}d}.jpg'
+                    
+                    # Save frame screenshot if enabled
+                    if config.save_frames:
+                        frame_path = os.path.join(config.frames_folder, frame_name)
+                        if not cv2.imwrite(frame_path, image):
+                            logger.warning(f"Warning: Failed to save frame to: {frame_path}")
+                        
+                    yield frame_name, image
+                    count += 1
+                
+                process.wait()
+                if process.returncode != 0:
+                    stderr_file.seek(0)
+                    stderr = stderr_file.read()
+                    logger.error(f"Error: {stderr.decode()}")
+                    raise ffmpeg.Error('ffmpeg', None, stderr)
+            finally:
+                # Stop ffmpeg if the consumer stopped early
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                process.stdout.close()
         
-        # get frames from video
-        video = ffmpeg.input(video_path)
+        if count == 0:
+            raise ValueError("No frames were extracted from the video")
+        logger.debug(f"Successfully extracted {count} frames")
         
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        raise
+
+class _TesseractAPIs:
+    """
+    Tesseract engines shared by the OCR worker threads.
+    
+    Each worker thread lazily creates one PyTessBaseAPI per language string
+    and reuses it for every frame, so language data is loaded once per thread
+    instead of once per frame. Each engine holds its own copy of the language
+    data, so memory grows with ocr_workers times the number of language
+    strings in use. All engines are released when the context exits.
+    """
+    
+    def __init__(self, config: Config):
+        self.config = config
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._apis: List[PyTessBaseAPI] = []
+    
+    def __enter__(self) -> '_TesseractAPIs':
+        return self
+    
+    def __exit__(self, *exc_info):
+        with self._lock:
+            for api in self._apis:
+                api.End()
+            self._apis.clear()
+    
+    def get(self, lang: str) -> PyTessBaseAPI:
+        """
+        Get the calling thread's engine for a language string.
+        
+        Args:
+            lang: Tesseract language string (e.g. eng+chi_tra)
+            
+        Returns:
+            Initialized tesseract engine
+            
+        Raises:
+            RuntimeError: If tesseract fails to load the language data
+        """
+        apis: Dict[str, PyTessBaseAPI] = getattr(self._local, 'apis', None)
+        if apis is None:
+            apis = self._local.apis = {}
+        if lang not in apis:
+            # Without a resolved folder, fall back to tesseract's built-in data path
+            path = {'path': self.config.tessdata_dir} if self.config.tessdata_dir else {}
+            api = PyTessBaseAPI(lang=lang, psm=self.config.psm, **path)
+            with self._lock:
+                self._apis.append(api)
+            apis[lang] = api
+        return apis[lang]
+
+def _ocr_image(image: np.ndarray, lang: str, apis: _TesseractAPIs) -> str:
+    """
+    Run OCR on a preprocessed image.
+    
+    Args:
+        image: Preprocessed single-channel grayscale image
+        lang: Tesseract language string (e.g. eng+chi_tra)
+        apis: Tesseract engines of the worker threads
+        
+    Returns:
+        Extracted text
+        
+    Raises:
+        RuntimeError: If OCR fails
+    """
+    api = apis.get(lang)
+    height, width = image.shape
+    api.SetImageBytes(image.tobytes(), width, height, 1, width)
+    return api.GetUTF8Text()
+
+def _ocr_image_per_language(image: np.ndarray, frame_name: str, apis: _TesseractAPIs, config: Config) -> str:
+    """
+    Run OCR on a preprocessed image separately for each configured language.
+    
+    Args:
+        image: Preprocessed single-channel grayscale image
+        frame_name: Name of the frame
+        apis: Tesseract engines of the worker threads
+        config: Configuration object containing settings
+        
+    Returns:
+        Text from every language that produced a result, one block per language
+    """
+    frame_text = []
+    for lang in config.languages:
         try:
-            # Calculate frame rate based on frame gap
-            frame_rate = 1.0 / config.frame_gap
-            video.output(output_pattern, start_number=0, r=frame_rate).run(capture_stdout=True, capture_stderr=True)
-        except ffmpeg.Error as e:
-            logger.error(f"Error: {e.stderr.decode() if e.stderr else str(e)}")
-            raise
+            lang_text = _ocr_image(image, lang, apis)
+            if lang_text.strip():  # Only add non-empty results
+                frame_text.append(lang_text)
+                logger.debug(f"Extracted text using {lang} for frame {frame_name}")
+        except Exception as e:
+            logger.warning(f"Warning: Failed to extract text using {lang}")
+            continue
+    
+    # Combine text from all languages
+    return '\n'.join(frame_text)
 
-        # get frames from frames folder
-        frames = [os.path.join(config.frames_folder, frame) 
-                 for frame in os.listdir(config.frames_folder) 
-                 if frame.endswith('.jpg')]
+def _extract_frame_text(frame_name: str, image: np.ndarray, apis: _TesseractAPIs, config: Config) -> Optional[str]:
+    """
+    Extract text from a single frame.
+    
+    The frame is preprocessed and then recognised by the worker thread's
+    tesseract engine. All languages are recognised in the same pass unless
+    config.per_language asks for a separate pass per language.
+    
+    Args:
+        frame_name: Name of the frame
+        image: Frame image as BGR numpy array
+        apis: Tesseract engines of the worker threads
+        config: Configuration object containing settings
         
-        logger.debug(f"Successfully extracted {len(frames)} frames")
-        return frames
+    Returns:
+        Text of the frame, or None if nothing was extracted
+    """
+    try:
+        logger.debug(f"Processing frame: {frame_name}")
+        processed_image = preprocess_image(image, frame_name, config)
         
+        if config.per_language:
+            frame_text = _ocr_image_per_language(processed_image, frame_name, apis, config)
+        else:
+            # Tesseract accepts several languages at once (e.g. eng+chi_tra),
+            # so a single pass covers all of them
+            frame_text = _ocr_image(processed_image, '+'.join(config.languages), apis)
     except Exception as e:
         logger.error(f"Error: {str(e)}")
-        raise
+        # Continue with next frame instead of failing completely
+        return None
+    
+    if not frame_text.strip():
+        logger.warning(f"Warning: No text extracted from frame {frame_name}")
+        return None
+    return frame_text
+
+def _prefetch(items: Iterable[Any], maxsize: int) -> Iterator[Any]:
+    """
+    Iterate over items while a background thread reads ahead.
+    
+    Up to maxsize items are buffered in a bounded queue, so the producer
+    (e.g. ffmpeg decoding frames) keeps running while the consumer is busy,
+    and pauses when the consumer falls behind.
+    
+    Args:
+        items: Iterable to read ahead from
+        maxsize: Maximum number of buffered items
+        
+    Yields:
+        The items, in order
+        
+    Raises:
+        Exception: Any exception raised while producing the items
+    """
+    buffer = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    
+    def put(entry: Tuple[Any, Optional[Exception]]) -> bool:
+        # Wait for room in the buffer unless the consumer has gone away
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    break
+            else:
+                put((_END, None))
+        except Exception as e:
+            put((_END, e))
+        finally:
+            # Release the producer's resources (e.g. the ffmpeg process) when stopped early
+            if hasattr(iterator, 'close'):
+                iterator.close()
+    
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is _END:
+                return
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+
+# Size of the text fingerprint; at 128x72 a line of subtitle text spans several cells
+_FINGERPRINT_SIZE = (128, 72)
+# Change in a cell's ink coverage (0-255) that counts as different, above compression noise
+_FINGERPRINT_TOLERANCE = 64
+
+def _frame_fingerprint(image: np.ndarray) -> np.ndarray:
+    """
+    Compute a coarse fingerprint of the text in a frame image.
+    
+    The frame is binarized with Otsu's method so that text strokes dominate,
+    then downscaled so each cell holds the ink coverage of its area.
+    
+    Args:
+        image: Frame image as BGR numpy array
+        
+    Returns:
+        Fingerprint as a 72x128 uint8 array
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+    return cv2.resize(binary, _FINGERPRINT_SIZE, interpolation=cv2.INTER_AREA)
+
+def _fingerprint_distance(a: np.ndarray, b: np.ndarray) -> int:
+    """Count the fingerprint cells whose ink coverage differs by more than the tolerance."""
+    return int(np.count_nonzero(cv2.absdiff(a, b) > _FINGERPRINT_TOLERANCE))
 
 # extract text from frames
-def extract_text(frames: List[str], config: Config = Config()) -> List[str]:
+def extract_text(frames: Iterable[Tuple[str, np.ndarray]], config: Optional[Config] = None) -> List[str]:
     """
     Extract text from frames using OCR.
     
+    Consecutive frames of static content (slides, subtitles) usually carry
+    the same text, so a frame whose text fingerprint differs from the last
+    OCR'd frame in fewer than config.dedup_threshold cells reuses its text.
+    The remaining frames are processed in parallel by a pool of worker
+    threads, while a background thread keeps reading up to
+    config.frame_queue_size frames ahead. At most two frames per worker
+    wait for OCR at a time, which bounds the memory held in decoded
+    frames. Each worker thread keeps its own tesseract engine, and
+    tesserocr releases the GIL while recognising, so threads are enough
+    to keep all cores busy.
+    
     Args:
-        frames: List of paths to frame images
+        frames: Iterable of (frame_name, BGR image) tuples, in video order
         config: Configuration object containing settings
         
     Returns:
-        List of extracted text strings
+        List of extracted text strings, in frame order
         
     Raises:
-        FileNotFoundError: If frame files don't exist
-        pytesseract.TesseractError: If OCR fails
+        RuntimeError: If OCR fails
     """
-    text = []
+    if config is None:
+        config = _default_config()
     
-    for frame in frames:
-        try:
-            if not os.path.exists(frame):
-                raise FileNotFoundError(f"Frame file not found: {frame}")
-                
-            logger.debug(f"Processing frame: {frame}")
-            
-            # Preprocess the image
-            processed_image = preprocess_image(frame, config)
+    # Debug images and per-frame text are written into these folders
+    config.create_folders()
+    
+    frame_names = []
+    sources = []  # index of the OCR'd frame whose text each frame uses
+    num_unique = 0
+    last_fingerprint = None
+    futures = []
+    pending = set()
+    
+    # The pool shuts down before the tesseract engines are released
+    with _TesseractAPIs(config) as apis, ThreadPoolExecutor(max_workers=config.ocr_workers) as executor:
+        # Decode upcoming frames in the background while earlier ones are OCR'd
+        for frame_name, image in _prefetch(frames, config.frame_queue_size):
+            frame_names.append(frame_name)
             
-            # Extract text using all configured languages
-            frame_text = []
-            for lang in config.languages:
-                try:
-                    lang_text = pytesseract.image_to_string(
-                        processed_image,
-                        lang=lang,
-                        config=config.tesseract_config
-                    )
-                    if lang_text.strip():  # Only add non-empty results
-                        frame_text.append(lang_text)
-                        logger.debug(f"Extracted text using {lang} for frame {frame}")
-                except Exception as e:
-                    logger.warning(f"Warning: Failed to extract text using {lang}")
+            # Only OCR frames that differ from the previous kept frame
+            if config.dedup_threshold > 0:
+                fingerprint = _frame_fingerprint(image)
+                if last_fingerprint is not None and _fingerprint_distance(fingerprint, last_fingerprint) < config.dedup_threshold:
+                    logger.debug(f"Skipping OCR for frame {frame_name}: same as previous frame")
+                    sources.append(num_unique - 1)
                     continue
+                last_fingerprint = fingerprint
             
-            if frame_text:
-                # Combine text from all languages
-                combined_text = '\n'.join(frame_text)
-                text.append(combined_text)
-                
-                # Save frame text if enabled
-                if config.save_frame_text:
-                    frame_name = os.path.basename(frame)
-                    output_path = os.path.join(config.text_folder, f'{frame_name}.txt')
-                    with open(output_path, 'w', encoding='utf-8') as f:
-                        f.write(combined_text)
-                    logger.debug(f"Saved text to: {output_path}")
-            else:
-                logger.warning("Warning: No text extracted from frame")
+            sources.append(num_unique)
+            num_unique += 1
             
-        except Exception as e:
-            logger.error(f"Error: {str(e)}")
-            # Continue with next frame instead of failing completely
+            # Bound the number of decoded frames waiting for OCR
+            if len(pending) >= 2 * config.ocr_workers:
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+            future = executor.submit(_extract_frame_text, frame_name, image, apis, config)
+            futures.append(future)
+            pending.add(future)
+        
+        unique_text = [future.result() for future in futures]
+    
+    if num_unique < len(frame_names):
+        logger.debug(f"Reused text for {len(frame_names) - num_unique} duplicate frames")
+    
+    text = []
+    for frame_name, source in zip(frame_names, sources):
+        frame_text = unique_text[source]
+        if not frame_text:
             continue
+        text.append(frame_text)
+        
+        # Save frame text if enabled
+        if config.save_frame_text:
+            output_path = os.path.join(config.text_folder, f'{frame_name}.txt')
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(frame_text)
+            logger.debug(f"Saved text to: {output_path}")
             
     return text
 
@@ -177,8 +505,9 @@ def save_results(results: List[str], video_name: str) -> None:
     try:
         # Save the deduplicated word list in the root directory
         output_path = f'{video_name}_words.txt'
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(results))
+        # Stream the words through a 64KB buffer instead of building one joined string
+        with open(output_path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            f.writelines(f'{word}\n' for word in results)
             
         logger.debug(f"Successfully saved results to: {output_path}")
         
@@ -186,75 +515,82 @@ def save_results(results: List[str], video_name: str) -> None:
         logger.error(f"Error: {str(e)}")
         raise
 
-def preprocess_image(image_path: str, config: Config = Config()) -> np.ndarray:
+def _save_debug_image(image: np.ndarray, frame_name: str, stage: str, config: Config) -> None:
+    """
+    Save an intermediate preprocessing image if its stage is selected for debugging.
+    
+    Args:
+        image: Image to save, in BGR or grayscale format
+        frame_name: Name of the frame, used for the debug image filename
+        stage: Name of the preprocessing stage
+        config: Configuration object containing settings
+    """
+    if not config.debug or stage not in config.debug_stages:
+        return
+    debug_path = os.path.join(config.debug_folder, f"{frame_name}_{stage}.jpg")
+    if not cv2.imwrite(debug_path, image):
+        logger.warning(f"Warning: Failed to save {stage} image to: {debug_path}")
+        return
+    logger.debug(f"Saved {stage} image to: {debug_path}")
+
+def preprocess_image(image: np.ndarray, frame_name: str, config: Optional[Config] = None) -> np.ndarray:
     """
     Preprocess the image for better OCR results.
     
+    The grayscale image is handed to OCR. In debug mode the stages listed in
+    config.debug_stages are saved to the debug folder; the thresholding,
+    dilation and contour stages outline text regions and are only computed
+    when one of them is selected. The 'mosaic' stage saves all stages as a
+    single image.
+    
     Args:
-        image_path: Path to the input image
+        image: Input image as BGR numpy array
+        frame_name: Name of the frame, used for debug image filenames
         config: Configuration object containing settings
         
     Returns:
-        Preprocessed image as numpy array in RGB format
+        Preprocessed image as single-channel grayscale numpy array
         
     Raises:
-        FileNotFoundError: If image file doesn't exist
         ValueError: If image is invalid or processing fails
     """
+    if config is None:
+        config = _default_config()
+    
     try:
-        # Read the image
-        image = cv2.imread(image_path)
-        if image is None:
-            raise FileNotFoundError(f"Could not read image: {image_path}")
+        _save_debug_image(image, frame_name, 'original', config)
             
-        # Save original image if debug mode is enabled
-        if config.debug:
-            debug_path = os.path.join(config.debug_folder, f"{os.path.basename(image_path)}_original.jpg")
-            cv2.imwrite(debug_path, image)
-            logger.debug(f"Saved original image to: {debug_path}")
-            
-        # Convert to grayscale
+        # Convert to grayscale; tesseract binarizes grayscale input itself, so this is the OCR input
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        if config.debug:
-            debug_path = os.path.join(config.debug_folder, f"{os.path.basename(image_path)}_gray.jpg")
-            cv2.imwrite(debug_path, gray)
-            logger.debug(f"Saved grayscale image to: {debug_path}")
-        
-        # Apply thresholding
-        thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
-        if config.debug:
-            debug_path = os.path.join(config.debug_folder, f"{os.path.basename(image_path)}_thresh.jpg")
-            cv2.imwrite(debug_path, thresh)
-            logger.debug(f"Saved thresholded image to: {debug_path}")
-        
-        # Apply dilation to remove noise
-        kernel = np.ones((3,3), np.uint8)
-        dilate = cv2.dilate(thresh, kernel, iterations=2)
-        if config.debug:
-            debug_path = os.path.join(config.debug_folder, f"{os.path.basename(image_path)}_dilate.jpg")
-            cv2.imwrite(debug_path, dilate)
-            logger.debug(f"Saved dilated image to: {debug_path}")
-        
-        # Find contours
-        contours, hierarchy = cv2.findContours(dilate, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # Draw contours on original image
-        image = cv2.drawContours(image, contours, -1, (0, 0, 255), 3)
-        if config.debug:
-            debug_path = os.path.join(config.debug_folder, f"{os.path.basename(image_path)}_contours.jpg")
-            cv2.imwrite(debug_path, image)
-            logger.debug(f"Saved image with contours to: {debug_path}")
-        
-        # Convert BGR to RGB for pytesseract
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        if config.debug:
-            debug_path = os.path.join(config.debug_folder, f"{os.path.basename(image_path)}_final.jpg")
-            cv2.imwrite(debug_path, cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR))  # Convert back to BGR for saving
-            logger.debug(f"Saved final RGB image to: {debug_path}")
-        
-        return image_rgb
+        _save_debug_image(gray, frame_name, 'gray', config)
+        
+        # The remaining stages only visualise text regions, so compute them only when saved
+        stages = set(config.debug_stages) if config.debug else set()
+        if stages & {'thresh', 'dilate', 'contours', 'mosaic'}:
+            # Apply thresholding
+            thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
+            _save_debug_image(thresh, frame_name, 'thresh', config)
+            
+        if stages & {'dilate', 'contours', 'mosaic'}:
+            # Apply dilation to remove noise; one 5x5 pass equals two 3x3 passes
+            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+            dilate = cv2.dilate(thresh, kernel)
+            _save_debug_image(dilate, frame_name, 'dilate', config)
+            
+        if stages & {'contours', 'mosaic'}:
+            # Find contours and draw them on a copy of the original image
+            contours, hierarchy = cv2.findContours(dilate, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            contours_image = cv2.drawContours(image.copy(), contours, -1, (0, 0, 255), 3)
+            _save_debug_image(contours_image, frame_name, 'contours', config)
+            
+        # Save every stage as one image instead of one encode per stage
+        if 'mosaic' in stages:
+            tiles = [image, gray, thresh, dilate, contours_image, np.zeros_like(image)]
+            tiles = [cv2.cvtColor(tile, cv2.COLOR_GRAY2BGR) if tile.ndim == 2 else tile for tile in tiles]
+            _save_debug_image(np.vstack([np.hstack(tiles[:3]), np.hstack(tiles[3:])]), frame_name, 'mosaic', config)
+        
+        return gray
         
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         raise ValueError(f"Failed to preprocess image: {str(e)}")
-